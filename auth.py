@@ -1,6 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError
+import asyncio
 import bcrypt
 import os
 import secrets
@@ -14,39 +18,64 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 MAX_LOGIN_ATTEMPTS = 5
 LOCKOUT_DURATION_MINUTES = 15
 
+# Argon2id hasher for new passwords; legacy bcrypt hashes are still verified
+password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+
+# argon2 and bcrypt release the GIL while hashing, so a dedicated pool runs
+# concurrent logins in parallel without tying up the default threadpool
+password_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix="password-hash")
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verify a password against its hash using bcrypt.
+    Verify a password against its hash using argon2id or bcrypt.
     
     Args:
         plain_password: The plain text password to verify
-        hashed_password: The bcrypt hashed password to check against
+        hashed_password: The argon2id or legacy bcrypt hash to check against
         
     Returns:
         bool: True if password matches, False otherwise
     """
     try:
+        if hashed_password.startswith("$argon2"):
+            return password_hasher.verify(hashed_password, plain_password)
         return bcrypt.checkpw(
             plain_password.encode('utf-8'),
             hashed_password.encode('utf-8')
         )
+    except VerifyMismatchError:
+        return False
     except Exception as e:
         print(f"Error verifying password: {e}")
         return False
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash should be upgraded to the current argon2id parameters."""
+    if not hashed_password.startswith("$argon2id$"):
+        return True
+    return password_hasher.check_needs_rehash(hashed_password)
+
 def get_password_hash(password: str) -> str:
     """
-    Hash a password using bcrypt with salt.
+    Hash a password using argon2id with salt.
     
     Args:
         password: The plain text password to hash
         
     Returns:
-        str: The bcrypt hashed password
+        str: The argon2id hashed password
     """
-    salt = bcrypt.gensalt(rounds=12)  # 12 rounds for good security/performance balance
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8')
+    return password_hasher.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the password-hashing pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the password-hashing pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
@@ -1,6 +1,10 @@
+import errno
 import os
-import uuid
+import re
+import secrets
 import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 import mimetypes
@@ -9,35 +13,56 @@ try:
 except ImportError:
     import Image
 import aiofiles
+from starlette.concurrency import run_in_threadpool
 
 # Allowed file types
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
 ALLOWED_MIME_TYPES = {'image/jpeg', 'image/png'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB in bytes
 
+# Characters not allowed in sanitized filenames
+_SANITIZE_RE = re.compile(r'[^A-Za-z0-9._-]+')
+UPLOAD_CHUNK_SIZE = 64 * 1024  # Read uploads 64KB at a time
+
 # Upload directories
 UPLOAD_DIR = Path("uploads")
 SECURE_UPLOAD_DIR = UPLOAD_DIR / "donations"
-TEMP_DIR = Path("temp")
+TEMP_DIR = Path("temp")  # Outside the public /uploads mount
+THUMBNAIL_DIR = SECURE_UPLOAD_DIR / "thumbnails"
+
+# Thumbnail settings for the admin gallery
+THUMBNAIL_SIZE = (320, 320)
+THUMBNAIL_QUALITY = 82
+# Larger images are served in full rather than decoded for a thumbnail (~48MB as RGB)
+MAX_THUMBNAIL_PIXELS = 4096 * 4096
+
+# Small dedicated pool so thumbnail decodes can't pile up in the shared threadpool
+_thumbnail_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="thumbnail")
 
 def ensure_directories():
     """Ensure all necessary directories exist."""
-    for directory in [UPLOAD_DIR, SECURE_UPLOAD_DIR, TEMP_DIR]:
+    for directory in [UPLOAD_DIR, SECURE_UPLOAD_DIR, TEMP_DIR, THUMBNAIL_DIR]:
         directory.mkdir(exist_ok=True)
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename to prevent path traversal attacks."""
-    # Remove any path separators and dangerous characters
-    filename = os.path.basename(filename)
-    # Keep only alphanumeric, dots, hyphens, and underscores
-    filename = ''.join(c for c in filename if c.isalnum() or c in '.-_')
+    # Remove any path separators, then keep only alphanumeric, dots, hyphens, and underscores
+    filename = _SANITIZE_RE.sub('', os.path.basename(filename))
     # Default to jpg if no filename
     if not filename:
         return 'unnamed_file.jpg'
     # Ensure it has an extension
-    if '.' not in filename:
-        return f"{filename}.jpg"
-    return filename
+    return filename if '.' in filename else f"{filename}.jpg"
+
+def move_file(src: Path, dst: Path):
+    """Move a file, as an atomic rename when both paths are on the same filesystem."""
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        # uploads/ may be a separate volume; fall back to copy-and-delete
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(str(src), str(dst))
 
 def generate_secure_filename(original_filename: str) -> str:
     """Generate a secure, randomized filename."""
@@ -49,12 +74,14 @@ def generate_secure_filename(original_filename: str) -> str:
         ext = '.jpg'  # Default to jpg if unknown
 
     # Generate random filename
-    random_name = str(uuid.uuid4())
+    random_name = secrets.token_urlsafe(16)
     return f"{random_name}{ext}"
 
 def validate_image_file(file_path: str) -> bool:
     """Validate that the file is actually a valid image (JPG or PNG)."""
     try:
+        # Image.open only parses the header, so format and size are available
+        # without decoding any pixel data
         with Image.open(file_path) as img:
             # Check if it's a JPEG or PNG
             if img.format not in ['JPEG', 'JPG', 'PNG']:
@@ -64,10 +91,78 @@ def validate_image_file(file_path: str) -> bool:
             if img.width > 10000 or img.height > 10000:  # Reasonable size limit
                 return False
 
+            # Check structural integrity without a full decode
+            img.verify()
+
             return True
     except Exception:
         return False
 
+def get_thumbnail_path(image_path: str) -> str:
+    """Get the upload-relative thumbnail path for an upload-relative image path."""
+    stem = Path(image_path).stem
+    return f"donations/thumbnails/{stem}.jpg"
+
+def make_thumbnail(src: str, dst: str, size=THUMBNAIL_SIZE) -> bool:
+    """Write a JPEG thumbnail of an image, preserving its aspect ratio."""
+    temp_path = TEMP_DIR / f"{secrets.token_urlsafe(8)}.jpg"
+    try:
+        with Image.open(src) as img:
+            # Header-only check, so oversized images are never decoded
+            if img.width * img.height > MAX_THUMBNAIL_PIXELS:
+                return False
+            # Let the JPEG decoder downscale while decoding
+            img.draft("RGB", size)
+            # Shrink before converting so no full-size RGB copy is made
+            img.thumbnail(size, Image.LANCZOS)
+            img.convert("RGB").save(temp_path, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+        # Publish with a rename so concurrent requests never see a partial file
+        move_file(temp_path, Path(dst))
+        return True
+    except Exception as e:
+        print(f"Error creating thumbnail for {src}: {e}")
+        if temp_path.exists():
+            temp_path.unlink()
+        return False
+
+def get_thumbnail_file(image_path: str) -> Optional[Path]:
+    """
+    Get the thumbnail of an uploaded image, creating it on first request.
+
+    Returns None if the image doesn't exist or is too large to thumbnail.
+    Blocks while the thumbnail is made, so call it from a worker thread.
+    """
+    thumbnail_path = get_thumbnail_path(image_path)
+    thumbnail_file = get_file_path(thumbnail_path)
+    if thumbnail_file:
+        return thumbnail_file
+
+    image_file = get_file_path(image_path)
+    if not image_file:
+        return None
+
+    dst = UPLOAD_DIR / thumbnail_path
+    if not _thumbnail_executor.submit(make_thumbnail, str(image_file), str(dst)).result():
+        return None
+    return dst
+
+def generate_missing_thumbnails(max_workers: Optional[int] = None) -> int:
+    """Create thumbnails for uploads that lack one, in parallel across CPU cores."""
+    jobs = []
+    for image_file in SECURE_UPLOAD_DIR.glob("*"):
+        if not image_file.is_file() or image_file.suffix.lower() not in ALLOWED_EXTENSIONS:
+            continue
+        thumbnail_file = THUMBNAIL_DIR / f"{image_file.stem}.jpg"
+        if not thumbnail_file.exists():
+            jobs.append((str(image_file), str(thumbnail_file)))
+
+    if not jobs:
+        return 0
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        results = executor.map(make_thumbnail, *zip(*jobs))
+        return sum(1 for created in results if created)
+
 async def save_upload_file_securely(file, filename: str) -> Optional[str]:
     """Save uploaded file with security measures."""
     try:
@@ -77,18 +172,22 @@ async def save_upload_file_securely(file, filename: str) -> Optional[str]:
         # Create temporary file path
         temp_path = TEMP_DIR / secure_filename
 
-        # Save file temporarily and check size
+        # Stream file to disk in chunks, checking size as we go
+        total_size = 0
         async with aiofiles.open(temp_path, 'wb') as buffer:
-            content = await file.read()
-            
-            # Check file size
-            if len(content) > MAX_FILE_SIZE:
-                raise ValueError(f"File size exceeds maximum allowed size of {MAX_FILE_SIZE / (1024 * 1024)}MB")
-            
-            await buffer.write(content)
-
-        # Validate the saved file
-        if not validate_image_file(str(temp_path)):
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+
+                total_size += len(chunk)
+                if total_size > MAX_FILE_SIZE:
+                    raise ValueError(f"File size exceeds maximum allowed size of {MAX_FILE_SIZE / (1024 * 1024)}MB")
+
+                await buffer.write(chunk)
+
+        # Validate the saved file in a worker thread so PIL doesn't block the event loop
+        if not await run_in_threadpool(validate_image_file, str(temp_path)):
             # Remove invalid file
             if temp_path.exists():
                 temp_path.unlink()
@@ -96,7 +195,7 @@ async def save_upload_file_securely(file, filename: str) -> Optional[str]:
 
         # Move to secure location
         final_path = SECURE_UPLOAD_DIR / secure_filename
-        shutil.move(str(temp_path), str(final_path))
+        move_file(temp_path, final_path)
 
         # Return relative path for database storage
         return f"donations/{secure_filename}"
@@ -107,21 +206,38 @@ async def save_upload_file_securely(file, filename: str) -> Optional[str]:
             temp_path.unlink()
         raise e
 
-def get_file_path(image_path: str) -> Optional[Path]:
-    """Get the full file path for serving files."""
-    if not image_path:
-        return None
+@lru_cache(maxsize=4096)
+def _resolve_upload_path(image_path: str) -> str:
+    """
+    Resolve an upload-relative path to an existing file (cached, uploads are immutable).
 
+    Misses raise instead of returning None because lru_cache doesn't cache
+    exceptions, so files created later (e.g. thumbnails) are still found.
+    """
     # Ensure path doesn't escape our upload directory
     path = Path(image_path)
     if path.is_absolute() or '..' in path.parts:
-        return None
+        raise FileNotFoundError(image_path)
 
     full_path = UPLOAD_DIR / path
     if not full_path.exists():
+        raise FileNotFoundError(image_path)
+
+    return str(full_path)
+
+def get_file_path(image_path: str) -> Optional[Path]:
+    """Get the full file path for serving files."""
+    if not image_path:
+        return None
+
+    try:
+        return Path(_resolve_upload_path(image_path))
+    except FileNotFoundError:
         return None
 
-    return full_path
+def clear_file_path_cache():
+    """Forget cached file lookups (call after deleting uploaded files)."""
+    _resolve_upload_path.cache_clear()
 
 def cleanup_temp_files():
     """Clean up temporary files (call periodically)."""
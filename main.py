@@ -1,17 +1,22 @@
 from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Form, Query, Body, Request, WebSocket, WebSocketDisconnect
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, StreamingResponse, RedirectResponse, Response
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_, func
-import pandas as pd
-from datetime import datetime, timedelta
+from sqlalchemy import case, desc, or_, func, select
+from datetime import datetime, timedelta, timezone
+import csv
+import io
 import json
+import orjson
 import os
 import secrets
+import threading
+import time
 from pathlib import Path
 from typing import List
 
@@ -31,10 +36,13 @@ from schemas import (
     DonationSubmissionCreate, DonationSubmission, AdminLogin, Token,
     AdminCreate, TokenData, PasswordChange
 )
-from auth import verify_password, get_password_hash, create_access_token, verify_token
+from auth import (
+    verify_password_async, password_needs_rehash, get_password_hash, get_password_hash_async,
+    create_access_token, verify_token
+)
 from file_utils import (
-    ensure_directories, save_upload_file_securely, get_file_path,
-    cleanup_temp_files, sanitize_filename
+    ensure_directories, save_upload_file_securely, get_file_path, get_thumbnail_path, get_thumbnail_file,
+    clear_file_path_cache, cleanup_temp_files, sanitize_filename
 )
 from security_middleware import (
     SecurityHeadersMiddleware,
@@ -44,6 +52,56 @@ from security_middleware import (
     limiter
 )
 from websocket_manager import manager as ws_manager
+from migrations import migrate_donation_submissions
+
+def get_submission_stats(db: Session) -> dict:
+    """Compute dashboard statistics in a single aggregate query."""
+    is_verified = DonationSubmissionModel.is_verified == True
+    # Conditional aggregates rather than FILTER (WHERE ...) for older SQLite versions
+    total_submissions, verified_count, total_amount = db.execute(select(
+        func.count(DonationSubmissionModel.id),
+        func.coalesce(func.sum(case((is_verified, 1), else_=0)), 0),
+        func.sum(case((is_verified, DonationSubmissionModel.amount_numeric)))
+    )).one()
+
+    return {
+        "total_submissions": total_submissions,
+        "verified_count": verified_count,
+        "pending_count": total_submissions - verified_count,
+        "total_amount": round(float(total_amount or 0), 2)
+    }
+
+# Short-lived stats snapshot so many dashboards refreshing at once share one query
+STATS_CACHE_TTL_SECONDS = 2.0
+# "generation" is bumped on every invalidation so a query that raced with a write isn't cached
+_stats_cache = {"data": None, "timestamp": 0.0, "generation": 0}
+_stats_cache_lock = threading.Lock()
+
+def get_cached_submission_stats() -> dict:
+    """Return dashboard statistics, recomputing at most once per STATS_CACHE_TTL_SECONDS."""
+    with _stats_cache_lock:
+        now = time.monotonic()
+        if _stats_cache["data"] is not None and now - _stats_cache["timestamp"] < STATS_CACHE_TTL_SECONDS:
+            return _stats_cache["data"]
+        generation = _stats_cache["generation"]
+
+    db = SessionLocal()
+    try:
+        stats = get_submission_stats(db)
+    finally:
+        db.close()
+
+    with _stats_cache_lock:
+        if _stats_cache["generation"] == generation:
+            _stats_cache["data"] = stats
+            _stats_cache["timestamp"] = now
+    return stats
+
+def invalidate_stats_cache():
+    """Drop the cached stats snapshot (call after submissions change)."""
+    with _stats_cache_lock:
+        _stats_cache["data"] = None
+        _stats_cache["generation"] += 1
 
 # Lifespan event handler
 from contextlib import asynccontextmanager
@@ -56,6 +114,9 @@ async def lifespan(app: FastAPI):
     # Create database tables
     Base.metadata.create_all(bind=engine)
 
+    # Add new columns/indexes to existing tables
+    migrate_donation_submissions()
+
     # Ensure directories exist
     ensure_directories()
 
@@ -65,8 +126,8 @@ async def lifespan(app: FastAPI):
     # Create default admin user
     db = SessionLocal()
     try:
-        # Check if default admin exists
-        admin = db.query(Admin).filter(Admin.username == "admin").first()
+        # Check if default admin exists (id only, and hash only when creating it)
+        admin = db.query(Admin.id).filter(Admin.username == "admin").first()
         if not admin:
             default_admin = Admin(
                 username="admin",
@@ -77,6 +138,7 @@ async def lifespan(app: FastAPI):
             db.add(default_admin)
             db.commit()
             print("✅ Default admin user created: admin/admin")
+            print("⚠️  Change the default admin password immediately")
         else:
             print("✅ Admin user already exists")
     finally:
@@ -89,6 +151,12 @@ async def lifespan(app: FastAPI):
     # Shutdown code (if needed)
     print("🛑 Shutting down server...")
 
+class OrjsonResponse(JSONResponse):
+    """JSON response rendered with orjson, which serializes datetimes natively."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
 # Create FastAPI app with lifespan
 app = FastAPI(
     title="Dawud Charity Hub - Donation System",
@@ -117,7 +185,11 @@ app.add_middleware(SecurityHeadersMiddleware)
 # 3. IP Whitelist (Optional) - Uncomment and configure if needed
 # admin_whitelist = os.getenv("ADMIN_IP_WHITELIST", "").split(",")
 # if admin_whitelist and admin_whitelist[0]:
-#     app.add_middleware(IPWhitelistMiddleware, whitelist=admin_whitelist)
+#     app.add_middleware(
+#         IPWhitelistMiddleware,
+#         whitelist=admin_whitelist,
+#         trust_proxy_headers=os.getenv("TRUST_PROXY_HEADERS", "").lower() == "true",
+#     )
 
 # CORS middleware for frontend integration
 # Production domains for Dawud Charity Hub
@@ -135,6 +207,10 @@ app.add_middleware(
     max_age=3600,  # Cache preflight requests for 1 hour
 )
 
+# Internal nginx location that serves the uploads directory (e.g. "/_protected_uploads/")
+# When set, admin images are sent by nginx via X-Accel-Redirect instead of through Python
+X_ACCEL_REDIRECT_PREFIX = os.getenv("X_ACCEL_REDIRECT_PREFIX", "")
+
 # Mount static files for serving uploaded images securely
 # In production, ensure uploads directory exists and has proper permissions
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -152,8 +228,18 @@ async def admin_login():
 # Security scheme
 security = HTTPBearer()
 
+def is_admin_active(username: str) -> bool:
+    """Check that an admin account exists and is active."""
+    db = SessionLocal()
+    try:
+        admin = db.query(Admin.is_active).filter(Admin.username == username).first()
+        return bool(admin and admin.is_active)
+    finally:
+        db.close()
+
 # Session-based authentication dependency
-async def get_current_admin(request: Request):
+# Plain def so FastAPI runs the DB lookup in its threadpool instead of on the event loop
+def get_current_admin(request: Request):
     """Get current admin user from session."""
     if "admin_username" not in request.session:
         raise HTTPException(
@@ -165,20 +251,15 @@ async def get_current_admin(request: Request):
     username = request.session["admin_username"]
 
     # Verify admin still exists and is active
-    db = SessionLocal()
-    try:
-        admin = db.query(Admin).filter(Admin.username == username).first()
-        if not admin or not admin.is_active:
-            # Clear invalid session
-            request.session.pop("admin_username", None)
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid session",
-                headers={"Location": "/admin"}
-            )
-        return username
-    finally:
-        db.close()
+    if not is_admin_active(username):
+        # Clear invalid session
+        request.session.pop("admin_username", None)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid session",
+            headers={"Location": "/admin"}
+        )
+    return username
 
 # JWT-based authentication (for API endpoints that still use tokens)
 async def get_current_admin_jwt(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -280,13 +361,16 @@ async def submit_donation(
         donor_contact=submission_data.donor_contact,
         bank_used=submission_data.bank_used,
         amount_donated=submission_data.amount_donated,
+        amount_numeric=submission_data.amount_numeric,
+        currency=submission_data.currency,
         message=submission_data.message,
         proof_image_path=image_path
     )
 
     db.add(db_submission)
-    db.commit()
-    db.refresh(db_submission)
+    await run_in_threadpool(db.commit)
+    await run_in_threadpool(db.refresh, db_submission)
+    invalidate_stats_cache()
 
     # Broadcast new donation via WebSocket
     await ws_manager.broadcast_new_donation({
@@ -297,7 +381,7 @@ async def submit_donation(
         "bank_used": db_submission.bank_used,
         "amount_donated": db_submission.amount_donated,
         "message": db_submission.message,
-        "submitted_at": db_submission.submitted_at.isoformat(),
+        "submitted_at": db_submission.submitted_at,
         "is_verified": db_submission.is_verified
     })
 
@@ -312,7 +396,7 @@ async def submit_donation(
 @limiter.limit("5/minute")  # Max 5 login attempts per minute per IP
 async def login_admin(request: Request, admin_credentials: AdminLogin, db: Session = Depends(get_db)):
     """Admin login endpoint with rate limiting and session-based authentication."""
-    admin = db.query(Admin).filter(Admin.username == admin_credentials.username).first()
+    admin = await run_in_threadpool(db.query(Admin).filter(Admin.username == admin_credentials.username).first)
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -325,12 +409,18 @@ async def login_admin(request: Request, admin_credentials: AdminLogin, db: Sessi
             detail="Account disabled"
         )
 
-    if not verify_password(admin_credentials.password, admin.hashed_password):
+    # Password hashing is CPU-heavy, so keep it off the event loop
+    if not await verify_password_async(admin_credentials.password, admin.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
 
+    # Upgrade legacy bcrypt hashes to argon2id now that we have the plain password
+    if password_needs_rehash(admin.hashed_password):
+        admin.hashed_password = await get_password_hash_async(admin_credentials.password)
+        await run_in_threadpool(db.commit)
+
     # Create session for authenticated admin
     request.session["admin_username"] = admin.username
     request.session["login_time"] = datetime.utcnow().isoformat()
@@ -365,7 +455,7 @@ async def change_password(
         )
 
     # Get the current admin user
-    admin = db.query(Admin).filter(Admin.username == current_admin).first()
+    admin = await run_in_threadpool(db.query(Admin).filter(Admin.username == current_admin).first)
     if not admin:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -373,7 +463,7 @@ async def change_password(
         )
 
     # Verify current password
-    if not verify_password(current_password, admin.hashed_password):
+    if not await verify_password_async(current_password, admin.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
@@ -387,8 +477,8 @@ async def change_password(
         )
 
     # Update password
-    admin.hashed_password = get_password_hash(new_password)
-    db.commit()
+    admin.hashed_password = await get_password_hash_async(new_password)
+    await run_in_threadpool(db.commit)
 
     # Clear session after password change for security
     request.session.clear()
@@ -400,51 +490,18 @@ async def change_password(
 
 # Protected admin endpoints
 @app.get("/api/admin/dashboard-stats")
-async def get_dashboard_stats(
+def get_dashboard_stats(
     request: Request,
-    current_admin: str = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: str = Depends(get_current_admin)
 ):
     """Get dashboard statistics."""
     try:
-        # Total submissions
-        total_submissions = db.query(DonationSubmissionModel).count()
-
-        # Verified submissions
-        verified_count = db.query(DonationSubmissionModel).filter(DonationSubmissionModel.is_verified == True).count()
-
-        # Pending submissions
-        pending_count = total_submissions - verified_count
-
-        # Total amount (from verified submissions only)
-        # Extract numeric part from amount strings like "100 ETB"
-        verified_submissions = db.query(DonationSubmissionModel).filter(DonationSubmissionModel.is_verified == True).all()
-        total_amount = 0.0
-        for submission in verified_submissions:
-            try:
-                # Extract number from string like "100 ETB", "1,000 ETB", or "100.50 ETB"
-                amount_str = submission.amount_donated
-                # Remove currency symbols and extra spaces
-                amount_str = amount_str.replace(' ETB', '').replace('ETB', '').replace(' BIRR', '').replace('BIRR', '').replace(' USD', '').replace('USD', '').replace(' EUR', '').replace('EUR', '').strip()
-                # Remove commas for float conversion
-                amount_str = amount_str.replace(',', '')
-                amount_num = float(amount_str)
-                total_amount += amount_num
-            except (ValueError, AttributeError):
-                # Skip invalid amounts
-                continue
-
-        return {
-            "total_submissions": total_submissions,
-            "verified_count": verified_count,
-            "pending_count": pending_count,
-            "total_amount": round(total_amount, 2)
-        }
+        return get_cached_submission_stats()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching dashboard stats: {str(e)}")
 
 @app.get("/api/admin/submissions")
-async def get_submissions(
+def get_submissions(
     request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=999999),
@@ -454,7 +511,21 @@ async def get_submissions(
     db: Session = Depends(get_db)
 ):
     """Get all donation submissions with pagination and search."""
-    query = db.query(DonationSubmissionModel)
+    # Select plain columns rather than ORM objects to skip identity-map overhead
+    query = db.query(
+        DonationSubmissionModel.id,
+        DonationSubmissionModel.transaction_reference,
+        DonationSubmissionModel.donor_name,
+        DonationSubmissionModel.donor_contact,
+        DonationSubmissionModel.bank_used,
+        DonationSubmissionModel.amount_donated,
+        DonationSubmissionModel.message,
+        DonationSubmissionModel.proof_image_path,
+        DonationSubmissionModel.submitted_at,
+        DonationSubmissionModel.is_verified,
+        DonationSubmissionModel.verified_at,
+        DonationSubmissionModel.verified_by
+    )
 
     if verified_only:
         query = query.filter(DonationSubmissionModel.is_verified == True)
@@ -472,28 +543,11 @@ async def get_submissions(
 
     submissions = query.order_by(desc(DonationSubmissionModel.submitted_at)).offset(skip).limit(limit).all()
 
-    # Convert to JSON-serializable format
-    result = []
-    for submission in submissions:
-        result.append({
-            "id": submission.id,
-            "transaction_reference": submission.transaction_reference,
-            "donor_name": submission.donor_name,
-            "donor_contact": submission.donor_contact,
-            "bank_used": submission.bank_used,
-            "amount_donated": submission.amount_donated,
-            "message": submission.message,
-            "proof_image_path": submission.proof_image_path,
-            "submitted_at": submission.submitted_at.isoformat() if submission.submitted_at else None,
-            "is_verified": submission.is_verified,
-            "verified_at": submission.verified_at.isoformat() if submission.verified_at else None,
-            "verified_by": submission.verified_by
-        })
-
-    return result
+    # Return directly so orjson serializes the rows (including datetimes) without jsonable_encoder
+    return OrjsonResponse([submission._asdict() for submission in submissions])
 
 @app.get("/api/admin/banks")
-async def get_banks(
+def get_banks(
     request: Request,
     current_admin: str = Depends(get_current_admin),
     db: Session = Depends(get_db)
@@ -507,7 +561,7 @@ async def get_banks(
         raise HTTPException(status_code=500, detail=f"Error fetching banks: {str(e)}")
 
 @app.get("/api/admin/submissions/{submission_id}", response_model=DonationSubmission)
-async def get_submission(
+def get_submission(
     request: Request,
     submission_id: int,
     current_admin: str = Depends(get_current_admin),
@@ -539,7 +593,9 @@ async def verify_submission(
             detail="is_verified field is required"
         )
 
-    submission = db.query(DonationSubmissionModel).filter(DonationSubmissionModel.id == submission_id).first()
+    submission = await run_in_threadpool(
+        db.query(DonationSubmissionModel).filter(DonationSubmissionModel.id == submission_id).first
+    )
     if not submission:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -550,7 +606,8 @@ async def verify_submission(
     submission.verified_at = datetime.utcnow()
     submission.verified_by = current_admin
 
-    db.commit()
+    await run_in_threadpool(db.commit)
+    invalidate_stats_cache()
 
     # Broadcast verification change via WebSocket
     await ws_manager.broadcast_donation_verified(
@@ -566,7 +623,7 @@ async def verify_submission(
 
 # Delete submission endpoint
 @app.delete("/api/admin/delete/{submission_id}")
-async def delete_submission(
+def delete_submission(
     request: Request,
     submission_id: int,
     current_admin: str = Depends(get_current_admin),
@@ -581,79 +638,124 @@ async def delete_submission(
         )
 
     # Delete associated image file if exists
-    if submission.proof_image:
+    if submission.proof_image_path:
         try:
-            image_path = get_file_path(submission.proof_image)
-            if image_path and os.path.exists(image_path):
-                os.remove(image_path)
+            for path in (submission.proof_image_path, get_thumbnail_path(submission.proof_image_path)):
+                image_path = get_file_path(path)
+                if image_path and os.path.exists(image_path):
+                    os.remove(image_path)
+            clear_file_path_cache()
         except Exception as e:
             print(f"Error deleting image file: {e}")
 
     # Delete the submission
     db.delete(submission)
     db.commit()
+    invalidate_stats_cache()
 
     return {
         "success": True,
         "message": "Submission deleted successfully"
     }
 
+EXPORT_HEADERS = [
+    "Transaction Reference", "Donor Name", "Contact", "Bank Used", "Amount", "Message",
+    "Image Path", "Submitted At", "Verified", "Verified At", "Verified By"
+]
+EXPORT_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def iter_export_rows(verified_only: bool):
+    """Yield formatted export rows, fetching them from the database in batches."""
+    query = select(
+        DonationSubmissionModel.transaction_reference,
+        DonationSubmissionModel.donor_name,
+        DonationSubmissionModel.donor_contact,
+        DonationSubmissionModel.bank_used,
+        DonationSubmissionModel.amount_donated,
+        DonationSubmissionModel.message,
+        DonationSubmissionModel.proof_image_path,
+        DonationSubmissionModel.submitted_at,
+        DonationSubmissionModel.is_verified,
+        DonationSubmissionModel.verified_at,
+        DonationSubmissionModel.verified_by
+    )
+
+    if verified_only:
+        query = query.where(DonationSubmissionModel.is_verified == True)
+
+    query = query.order_by(desc(DonationSubmissionModel.submitted_at)).execution_options(yield_per=1000)
+
+    # Use a dedicated session since rows are consumed while the response streams
+    db = SessionLocal()
+    try:
+        for row in db.execute(query):
+            yield (
+                row.transaction_reference,
+                row.donor_name,
+                row.donor_contact,
+                row.bank_used,
+                row.amount_donated,
+                row.message or "",
+                row.proof_image_path or "",
+                row.submitted_at.strftime(EXPORT_DATE_FORMAT) if row.submitted_at else "",
+                "Yes" if row.is_verified else "No",
+                row.verified_at.strftime(EXPORT_DATE_FORMAT) if row.verified_at else "",
+                row.verified_by or ""
+            )
+    finally:
+        db.close()
+
+def stream_csv_export(rows):
+    """Write rows as CSV, yielding roughly 16KB chunks."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_HEADERS)
+
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() > 16384:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+def build_excel_export(rows) -> io.BytesIO:
+    """Write rows to an in-memory workbook without building a cell DOM."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Sheet1")
+    worksheet.append(EXPORT_HEADERS)
+    for row in rows:
+        worksheet.append(row)
+
+    output = io.BytesIO()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
 @app.get("/api/admin/export")
-async def export_submissions(
+def export_submissions(
     request: Request,
     format: str = Query("csv", pattern="^(csv|excel)$"),
     verified_only: bool = Query(False),
-    current_admin: str = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    current_admin: str = Depends(get_current_admin)
 ):
     """Export submissions as CSV or Excel."""
-    from io import BytesIO
-    
-    query = db.query(DonationSubmissionModel)
-
-    if verified_only:
-        query = query.filter(DonationSubmissionModel.is_verified == True)
-
-    submissions = query.order_by(desc(DonationSubmissionModel.submitted_at)).all()
-
-    # Convert to DataFrame
-    data = []
-    for sub in submissions:
-        data.append({
-            "Transaction Reference": sub.transaction_reference,
-            "Donor Name": sub.donor_name,
-            "Contact": sub.donor_contact,
-            "Bank Used": sub.bank_used,
-            "Amount": sub.amount_donated,
-            "Message": sub.message or "",
-            "Image Path": sub.proof_image_path or "",
-            "Submitted At": sub.submitted_at.strftime("%Y-%m-%d %H:%M:%S"),
-            "Verified": "Yes" if sub.is_verified else "No",
-            "Verified At": sub.verified_at.strftime("%Y-%m-%d %H:%M:%S") if sub.verified_at else "",
-            "Verified By": sub.verified_by or ""
-        })
-
-    df = pd.DataFrame(data)
-    
     # Generate filename
     filename = f"donation_submissions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format if format == 'csv' else 'xlsx'}"
 
-    # Create file in memory
-    output = BytesIO()
-    
     if format == "excel":
-        df.to_excel(output, index=False, engine='openpyxl')
+        content = build_excel_export(iter_export_rows(verified_only))
         media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    else:  # CSV
-        df.to_csv(output, index=False)
+    else:  # CSV, streamed as rows are read so memory stays flat
+        content = stream_csv_export(iter_export_rows(verified_only))
         media_type = "text/csv"
     
-    # Seek to beginning of file
-    output.seek(0)
-    
     # Return streaming response
     return StreamingResponse(
-        output,
+        content,
         media_type=media_type,
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
@@ -662,19 +764,34 @@ async def export_submissions(
 
 # Serve uploaded images securely
 @app.get("/api/admin/images/{image_path:path}")
-async def get_submission_image(
+def get_submission_image(
     request: Request,
     image_path: str,
+    thumbnail: bool = Query(False),
     current_admin: str = Depends(get_current_admin)
 ):
-    """Serve uploaded images for admin viewing."""
-    file_path = get_file_path(image_path)
+    """Serve uploaded images (or their thumbnails) for admin viewing."""
+    file_path = None
+    if thumbnail:
+        # Created on first request; falls back to the full image if it can't be made
+        file_path = get_thumbnail_file(image_path)
+        if file_path:
+            image_path = get_thumbnail_path(image_path)
+    if not file_path:
+        file_path = get_file_path(image_path)
     if not file_path:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Image not found"
         )
 
+    if X_ACCEL_REDIRECT_PREFIX:
+        # Authenticated above; let nginx sendfile the image straight from disk
+        return Response(
+            media_type="image/jpeg",
+            headers={"X-Accel-Redirect": f"{X_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{image_path}"}
+        )
+
     return FileResponse(file_path, media_type="image/jpeg")
 
 
@@ -696,14 +813,9 @@ async def websocket_endpoint(websocket: WebSocket, token: str = Query(...)):
             return
             
         # Verify admin exists and is active
-        db = SessionLocal()
-        try:
-            admin = db.query(Admin).filter(Admin.username == admin_username).first()
-            if not admin or not admin.is_active:
-                await websocket.close(code=1008, reason="Admin not found or inactive")
-                return
-        finally:
-            db.close()
+        if not await run_in_threadpool(is_admin_active, admin_username):
+            await websocket.close(code=1008, reason="Admin not found or inactive")
+            return
         
         # Connect to WebSocket manager
         await ws_manager.connect(websocket, admin_username)
@@ -720,39 +832,15 @@ async def websocket_endpoint(websocket: WebSocket, token: str = Query(...)):
                     
                     # Handle ping messages for keep-alive
                     if message.get("type") == "ping":
-                        await websocket.send_json({
+                        await ws_manager.send_personal_message({
                             "type": "pong",
-                            "timestamp": datetime.now().isoformat()
-                        })
+                            "timestamp": datetime.now(timezone.utc)
+                        }, websocket)
                     
                     # Handle request for current stats
                     elif message.get("type") == "request_stats":
-                        db = SessionLocal()
-                        try:
-                            total_submissions = db.query(DonationSubmissionModel).count()
-                            verified_count = db.query(DonationSubmissionModel).filter(
-                                DonationSubmissionModel.is_verified == True
-                            ).count()
-                            pending_count = total_submissions - verified_count
-                            
-                            total_amount = db.query(
-                                func.sum(func.cast(func.replace(DonationSubmissionModel.amount_donated, ',', ''), float))
-                            ).filter(
-                                DonationSubmissionModel.is_verified == True
-                            ).scalar() or 0
-                            
-                            await ws_manager.send_personal_message({
-                                "type": "stats_update",
-                                "data": {
-                                    "total_submissions": total_submissions,
-                                    "verified_count": verified_count,
-                                    "pending_count": pending_count,
-                                    "total_amount": float(total_amount)
-                                },
-                                "timestamp": datetime.now().isoformat()
-                            }, websocket)
-                        finally:
-                            db.close()
+                        # Send to every dashboard so concurrent requests share one snapshot
+                        await ws_manager.broadcast_stats_update(await run_in_threadpool(get_cached_submission_stats))
                     
                 except json.JSONDecodeError:
                     # Ignore malformed JSON
@@ -789,4 +877,11 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # WebSocket connections and rate limits are kept in process memory, so
+    # only raise WEB_CONCURRENCY once those are backed by shared storage
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
\ No newline at end of file
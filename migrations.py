@@ -0,0 +1,138 @@
+"""
+Schema migrations for existing databases.
+
+create_all() only creates missing tables, so columns and indexes added to
+the models later are created here, and derived columns are backfilled when
+they are added. Runs automatically on startup; for large databases it can be
+run ahead of time with `python migrations.py`, which also retries backfills
+for rows still missing values and creates missing upload thumbnails.
+Installing numba (`pip install numba`) speeds up backfilling amounts on
+large tables.
+"""
+
+from decimal import Decimal
+from typing import List, Optional
+from sqlalchemy import inspect, text
+
+from database import engine, SessionLocal
+from models import DonationSubmission
+from schemas import parse_amount, parse_currency
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Below this many rows the JIT compile costs more than it saves
+NUMBA_BATCH_THRESHOLD = 10000
+
+if njit is not None:
+    @njit(cache=True)
+    def _parse_amount_kernel(chars, out):
+        """Parse digits and a single decimal point from each row of a byte matrix."""
+        for i in range(chars.shape[0]):
+            value = 0.0
+            scale = 0.0
+            seen_digit = False
+            valid = True
+            for j in range(chars.shape[1]):
+                c = chars[i, j]
+                if c == 0:  # End of a NUL-padded string
+                    break
+                if 48 <= c <= 57:  # '0'-'9'
+                    seen_digit = True
+                    if scale > 0.0:
+                        value += (c - 48) * scale
+                        scale /= 10.0
+                    else:
+                        value = value * 10.0 + (c - 48)
+                elif c == 46:  # '.'
+                    if scale > 0.0:
+                        valid = False
+                        break
+                    scale = 0.1
+            out[i] = value if seen_digit and valid else np.nan
+
+def parse_amounts(amounts: List[str]) -> List[Optional[Decimal]]:
+    """Parse many amount strings, using the numba kernel for large batches when available."""
+    if njit is None or len(amounts) < NUMBA_BATCH_THRESHOLD:
+        return [parse_amount(amount) for amount in amounts]
+
+    # The kernel only understands ASCII digits, but parse_amount also accepts other
+    # Unicode digits (e.g. "١٢٣"), so non-ASCII rows are parsed in Python instead
+    encoded = [amount.encode("ascii") if amount and amount.isascii() else b"" for amount in amounts]
+    width = max(1, max(len(value) for value in encoded))
+    chars = np.array(encoded, dtype=f"S{width}").view(np.uint8).reshape(len(encoded), width)
+    out = np.empty(len(encoded), dtype=np.float64)
+    _parse_amount_kernel(chars, out)
+
+    return [
+        parse_amount(amount) if amount and not amount.isascii()
+        else None if np.isnan(value) else Decimal(f"{value:.2f}")
+        for amount, value in zip(amounts, out)
+    ]
+
+def migrate_donation_submissions(backfill_all: bool = False):
+    """
+    Bring an existing donation_submissions table up to date with the model.
+
+    Derived columns are only backfilled when they were just added, unless
+    backfill_all is set, so startup doesn't rescan rows that can't be parsed.
+    """
+    table = DonationSubmission.__table__
+    existing_columns = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    added_columns = set()
+
+    with engine.begin() as connection:
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                added_columns.add(column.name)
+
+    for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        if backfill_all or "amount_numeric" in added_columns:
+            rows = db.query(DonationSubmission.id, DonationSubmission.amount_donated).filter(
+                DonationSubmission.amount_numeric == None
+            ).all()
+            amounts = parse_amounts([row.amount_donated for row in rows])
+            # Unparseable amounts stay NULL, so there is nothing to write for them
+            updates = [
+                {"id": row.id, "amount_numeric": amount}
+                for row, amount in zip(rows, amounts)
+                if amount is not None
+            ]
+            if updates:
+                db.bulk_update_mappings(DonationSubmission, updates)
+                db.commit()
+                print(f"✅ Backfilled numeric amounts for {len(updates)} submissions")
+
+        if backfill_all or "currency" in added_columns:
+            rows = db.query(DonationSubmission.id, DonationSubmission.amount_donated).filter(
+                DonationSubmission.currency == None
+            ).all()
+            if rows:
+                db.bulk_update_mappings(DonationSubmission, [
+                    {"id": row.id, "currency": parse_currency(row.amount_donated)}
+                    for row in rows
+                ])
+                db.commit()
+                print(f"✅ Backfilled currencies for {len(rows)} submissions")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    from database import Base
+    from file_utils import ensure_directories, generate_missing_thumbnails
+
+    Base.metadata.create_all(bind=engine)
+    migrate_donation_submissions(backfill_all=True)
+
+    ensure_directories()
+    print(f"✅ Created {generate_missing_thumbnails()} missing thumbnails")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, Index
 from datetime import datetime
 import uuid
 
@@ -14,13 +14,20 @@ class DonationSubmission(Base):
     donor_contact = Column(String, nullable=False)  # Email or phone
     bank_used = Column(String, nullable=False)
     amount_donated = Column(String, nullable=False)
+    amount_numeric = Column(Numeric(12, 2), nullable=True)  # Parsed from amount_donated for SQL aggregation
+    currency = Column(String(3), nullable=True, default="ETB")  # ISO code parsed from amount_donated
     message = Column(Text, nullable=True)
     proof_image_path = Column(String, nullable=True)
-    submitted_at = Column(DateTime, default=datetime.utcnow)
+    submitted_at = Column(DateTime, default=datetime.utcnow, index=True)
     is_verified = Column(Boolean, default=False)
     verified_at = Column(DateTime, nullable=True)
     verified_by = Column(String, nullable=True)  # Admin username who verified
 
+    __table_args__ = (
+        Index("ix_donation_submissions_verified_amount", "is_verified", "amount_numeric"),
+        Index("ix_donation_submissions_verified_submitted", "is_verified", "submitted_at"),
+    )
+
 class Admin(Base):
     __tablename__ = "admins"
 
@@ -1,8 +1,60 @@
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, validator
 from typing import Optional
 from datetime import datetime
+from decimal import Decimal, InvalidOperation
 import re
 
+# Validation patterns, compiled once at import
+_TXREF_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+_EMAIL_RE = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+# Supports both comma-separated and plain formats, with an optional currency
+_AMOUNT_RE = re.compile(r'^\d{1,3}(,\d{3})*(\.\d{1,2})?\s*(ETB|BIRR|USD|EUR)?$|^\d+(\.\d{1,2})?\s*(ETB|BIRR|USD|EUR)?$', re.IGNORECASE)
+_USERNAME_RE = re.compile(r'^[a-zA-Z0-9_]+$')
+
+# Matches everything except digits and the decimal point in amounts like "1,000.50 ETB"
+_AMOUNT_CLEAN_RE = re.compile(r'[^\d.]')
+# Trailing currency suffix of an amount
+_CURRENCY_SUFFIX_RE = re.compile(r'([A-Za-z]+)\s*$')
+
+# Accepted currency suffixes mapped to ISO 4217 codes (birr is ETB)
+CURRENCY_CODES = {"ETB": "ETB", "BIRR": "ETB", "USD": "USD", "EUR": "EUR"}
+DEFAULT_CURRENCY = "ETB"
+_CURRENCIES = frozenset(CURRENCY_CODES)
+
+# Characters allowed in phone numbers (besides whitespace) after an optional leading '+'
+_PHONE_CHARS = frozenset('0123456789-()')
+
+def _is_phone_number(value: str) -> bool:
+    """Check for an optional '+' followed by 10+ digits, hyphens, parentheses or whitespace."""
+    phone = value.replace(' ', '')
+    if phone.startswith('+'):
+        phone = phone[1:]
+    return len(phone) >= 10 and all(c in _PHONE_CHARS or c.isspace() for c in phone)
+
+def _is_plain_amount(value: str) -> bool:
+    """Fast check for the common "100", "100.50" and "100 ETB" forms, without the regex."""
+    number, _, currency = value.partition(' ')
+    if currency and currency.upper() not in _CURRENCIES:
+        return False
+    whole, dot, fraction = number.partition('.')
+    if not (whole.isascii() and whole.isdigit()):
+        return False
+    return not dot or (len(fraction) in (1, 2) and fraction.isascii() and fraction.isdigit())
+
+def parse_amount(amount: str) -> Optional[Decimal]:
+    """Extract the numeric value from an amount string, or None if it can't be parsed."""
+    try:
+        return Decimal(_AMOUNT_CLEAN_RE.sub('', amount))
+    except (InvalidOperation, TypeError):
+        return None
+
+def parse_currency(amount: str) -> str:
+    """Get the ISO currency code of an amount string, defaulting to ETB."""
+    match = _CURRENCY_SUFFIX_RE.search(amount or '')
+    if not match:
+        return DEFAULT_CURRENCY
+    return CURRENCY_CODES.get(match.group(1).upper(), DEFAULT_CURRENCY)
+
 class DonationSubmissionBase(BaseModel):
     transaction_reference: Optional[str] = None
     donor_name: str
@@ -12,58 +64,68 @@ class DonationSubmissionBase(BaseModel):
     message: Optional[str] = None
 
 class DonationSubmissionCreate(DonationSubmissionBase):
+    # Strings are stripped before the validators below run
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     @validator('transaction_reference')
     def validate_transaction_reference(cls, v):
         if v is None:
             return None
-        if not v.strip():
+        if not v:
             return None  # Allow empty transaction reference
         if len(v) < 3:
             raise ValueError('Transaction reference must be at least 3 characters')
         if len(v) > 50:
             raise ValueError('Transaction reference must be less than 50 characters')
         # Allow alphanumeric, hyphens, and underscores
-        if not re.match(r'^[a-zA-Z0-9_-]+$', v):
+        if not _TXREF_RE.match(v):
             raise ValueError('Transaction reference can only contain letters, numbers, hyphens, and underscores')
-        return v.strip()
+        return v
 
     @validator('donor_name')
     def validate_name(cls, v):
-        if not v.strip():
+        if not v:
             raise ValueError('Donor name is required')
         if len(v) < 2:
             raise ValueError('Donor name must be at least 2 characters')
         if len(v) > 100:
             raise ValueError('Donor name must be less than 100 characters')
-        return v.strip()
+        return v
 
     @validator('donor_contact')
     def validate_contact(cls, v):
-        if not v.strip():
+        if not v:
             raise ValueError('Contact information is required')
         # Check if it's a valid email or phone number
-        email_pattern = r'^[^\s@]+@[^\s@]+\.[^\s@]+$'
-        phone_pattern = r'^[\+]?[0-9\s\-\(\)]{10,}$'
-
-        if not (re.match(email_pattern, v) or re.match(phone_pattern, v.replace(' ', ''))):
+        if not (_EMAIL_RE.match(v) or _is_phone_number(v)):
             raise ValueError('Please enter a valid email or phone number')
-        return v.strip()
+        return v
 
     @validator('bank_used')
     def validate_bank(cls, v):
-        if not v.strip():
+        if not v:
             raise ValueError('Bank information is required')
-        return v.strip()
+        return v
 
     @validator('amount_donated')
     def validate_amount(cls, v):
-        if not v.strip():
+        if not v:
             raise ValueError('Amount is required')
-        # Allow numbers with optional decimal and currency symbols, supporting both comma-separated and plain formats
-        amount_pattern = r'^\d{1,3}(,\d{3})*(\.\d{1,2})?\s*(ETB|BIRR|USD|EUR)?$|^\d+(\.\d{1,2})?\s*(ETB|BIRR|USD|EUR)?$'
-        if not re.match(amount_pattern, v.upper()):
+        # Allow numbers with optional decimal and currency symbols
+        if not (_is_plain_amount(v) or _AMOUNT_RE.match(v)):
             raise ValueError('Please enter a valid amount (e.g., 100, 1,000, 100.50, 100 ETB)')
-        return v.strip()
+        return v
+
+    @property
+    def amount_numeric(self) -> Optional[Decimal]:
+        """Numeric value of the validated amount, for storage and aggregation."""
+        return parse_amount(self.amount_donated)
+
+    @property
+    def currency(self) -> str:
+        """ISO currency code of the validated amount."""
+        return parse_currency(self.amount_donated)
+
 
 class DonationSubmission(DonationSubmissionBase):
     id: int
@@ -74,8 +136,7 @@ class DonationSubmission(DonationSubmissionBase):
     verified_at: Optional[datetime] = None
     verified_by: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class AdminLogin(BaseModel):
     username: str
@@ -95,13 +156,14 @@ class AdminCreate(BaseModel):
 
     @validator('username')
     def validate_username(cls, v):
-        if not v.strip():
+        v = v.strip()
+        if not v:
             raise ValueError('Username is required')
         if len(v) < 3:
             raise ValueError('Username must be at least 3 characters')
-        if not re.match(r'^[a-zA-Z0-9_]+$', v):
+        if not _USERNAME_RE.match(v):
             raise ValueError('Username can only contain letters, numbers, and underscores')
-        return v.strip()
+        return v
 
     @validator('password')
     def validate_password(cls, v):
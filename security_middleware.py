@@ -10,10 +10,23 @@ from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from typing import Callable
+import os
 import re
 
+# Optional: Hyperscan matches all patterns in a single SIMD-accelerated pass
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 # Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Counters live in process memory by default; point RATELIMIT_STORAGE at
+# Redis (e.g. redis://localhost:6379) to share them across workers
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=os.getenv("RATELIMIT_STORAGE", "memory://"),
+    strategy="fixed-window",
+)
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     """
@@ -70,6 +83,48 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
         r"(<embed[^>]*>)"
     ]
     
+    # Each category compiled once into a single alternation, so a body is scanned once per category
+    _SQLI_RE = re.compile("|".join(SQL_INJECTION_PATTERNS), re.IGNORECASE)
+    _XSS_RE = re.compile("|".join(XSS_PATTERNS), re.IGNORECASE)
+    
+    # Largest JSON body accepted; no JSON endpoint takes more, and bigger bodies would be costly to scan
+    MAX_SCAN_BYTES = 64 * 1024
+    
+    def __init__(self, app):
+        super().__init__(app)
+        self._hs_database = None
+        if hyperscan is not None:
+            patterns = self.SQL_INJECTION_PATTERNS + self.XSS_PATTERNS
+            try:
+                database = hyperscan.Database()
+                database.compile(
+                    expressions=[pattern.encode() for pattern in patterns],
+                    ids=list(range(len(patterns))),
+                    elements=len(patterns),
+                    flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns)
+                )
+                self._hs_database = database
+            except hyperscan.error as e:
+                print(f"Hyperscan unavailable, falling back to regex scanning: {e}")
+    
+    def _is_suspicious(self, body: bytes) -> bool:
+        """Check a request body against the SQL injection and XSS patterns."""
+        if self._hs_database is not None:
+            matches = []
+
+            def on_match(pattern_id, start, end, flags, context):
+                matches.append(pattern_id)
+                return True  # Stop at the first match
+
+            try:
+                self._hs_database.scan(body, match_event_handler=on_match)
+            except hyperscan.error:
+                pass  # Raised when on_match stops the scan
+            return bool(matches)
+
+        body_str = body.decode('utf-8', errors='ignore')
+        return bool(self._SQLI_RE.search(body_str) or self._XSS_RE.search(body_str))
+    
     async def dispatch(self, request: Request, call_next: Callable):
         # Skip validation for safe methods and certain paths
         if request.method in ["GET", "OPTIONS"] or request.url.path.startswith("/admin/assets"):
@@ -86,27 +141,24 @@ class RequestValidationMiddleware(BaseHTTPMiddleware):
                         content={"detail": "Request payload too large. Maximum size is 5MB."}
                     )
                 
-                # Get request body if it's JSON
-                if request.headers.get("content-type") == "application/json":
+                # Get request body if it's JSON (including "application/json; charset=utf-8")
+                if request.headers.get("content-type", "").startswith("application/json"):
                     try:
                         body = await request.body()
-                        body_str = body.decode('utf-8')
                         
-                        # Check for SQL injection patterns
-                        for pattern in self.SQL_INJECTION_PATTERNS:
-                            if re.search(pattern, body_str, re.IGNORECASE):
-                                return JSONResponse(
-                                    status_code=400,
-                                    content={"detail": "Invalid input detected"}
-                                )
+                        # Reject rather than scan a prefix, which padding could bypass
+                        if len(body) > self.MAX_SCAN_BYTES:
+                            return JSONResponse(
+                                status_code=413,
+                                content={"detail": "JSON payload too large. Maximum size is 64KB."}
+                            )
                         
-                        # Check for XSS patterns
-                        for pattern in self.XSS_PATTERNS:
-                            if re.search(pattern, body_str, re.IGNORECASE):
-                                return JSONResponse(
-                                    status_code=400,
-                                    content={"detail": "Invalid input detected"}
-                                )
+                        # Check for SQL injection and XSS patterns
+                        if self._is_suspicious(body):
+                            return JSONResponse(
+                                status_code=400,
+                                content={"detail": "Invalid input detected"}
+                            )
                     except:
                         pass  # Not JSON or can't decode, continue
             
@@ -122,14 +174,28 @@ class IPWhitelistMiddleware(BaseHTTPMiddleware):
     Set ADMIN_IP_WHITELIST environment variable to enable
     """
     
-    def __init__(self, app, whitelist: list = None):
+    def __init__(self, app, whitelist: list = None, trust_proxy_headers: bool = False):
         super().__init__(app)
-        self.whitelist = whitelist or []
+        self.whitelist = frozenset(ip.strip() for ip in whitelist or () if ip.strip())
+        # X-Forwarded-For can be set by any client, so only honour it
+        # behind a reverse proxy that appends the real peer address
+        self.trust_proxy_headers = trust_proxy_headers
+    
+    def _client_ip(self, request: Request) -> str:
+        if self.trust_proxy_headers:
+            forwarded_for = request.headers.get("x-forwarded-for")
+            if forwarded_for:
+                # The proxy appends the address it saw as the last entry
+                return forwarded_for.rpartition(",")[2].strip()
+        return request.client.host if request.client else ""
     
     async def dispatch(self, request: Request, call_next: Callable):
         # Only check admin endpoints if whitelist is configured
-        if self.whitelist and request.url.path.startswith("/api/admin"):
-            client_ip = get_remote_address(request)
+        if not self.whitelist:
+            return await call_next(request)
+        
+        if request.url.path.startswith("/api/admin"):
+            client_ip = self._client_ip(request)
             
             if client_ip not in self.whitelist:
                 return JSONResponse(
@@ -5,19 +5,47 @@ Manages WebSocket connections and broadcasts events to connected admin clients.
 
 from typing import Dict, Set
 from fastapi import WebSocket
-import json
+import asyncio
 import logging
-from datetime import datetime
+import orjson
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
 
+def encode_message(message: dict) -> str:
+    """Serialize a message with orjson (sent as a text frame for the dashboard's JSON.parse)."""
+    # OPT_UTC_Z renders UTC timestamps with a "Z" suffix
+    return orjson.dumps(message, option=orjson.OPT_UTC_Z).decode("utf-8")
+
+
+# Pre-encoded envelope fragments for broadcast events: {"type": ..., "data": ..., "timestamp": ...}
+_NEW_DONATION_PREFIX = b'{"type":"new_donation","data":'
+_DONATION_VERIFIED_PREFIX = b'{"type":"donation_verified","data":'
+_DONATION_UNVERIFIED_PREFIX = b'{"type":"donation_unverified","data":'
+_STATS_UPDATE_PREFIX = b'{"type":"stats_update","data":'
+_TIMESTAMP_INFIX = b',"timestamp":'
+
+
+def encode_event(prefix: bytes, data: dict, timestamp: datetime) -> str:
+    """Serialize an event envelope, encoding only its data and timestamp."""
+    return (
+        prefix
+        + orjson.dumps(data, option=orjson.OPT_UTC_Z)
+        + _TIMESTAMP_INFIX
+        + orjson.dumps(timestamp, option=orjson.OPT_UTC_Z)
+        + b"}"
+    ).decode("utf-8")
+
+
 class ConnectionManager:
     """Manages WebSocket connections for real-time updates."""
     
     def __init__(self):
         # Store active connections: {admin_username: set of WebSocket connections}
         self.active_connections: Dict[str, Set[WebSocket]] = {}
+        # Flat view of the same connections {WebSocket: admin_username} for single-pass broadcasts
+        self._all_connections: Dict[WebSocket, str] = {}
         self.connection_count = 0
         
     async def connect(self, websocket: WebSocket, admin_username: str):
@@ -28,6 +56,7 @@ class ConnectionManager:
             self.active_connections[admin_username] = set()
         
         self.active_connections[admin_username].add(websocket)
+        self._all_connections[websocket] = admin_username
         self.connection_count += 1
         
         logger.info(f"Admin '{admin_username}' connected. Total connections: {self.connection_count}")
@@ -37,7 +66,7 @@ class ConnectionManager:
             {
                 "type": "connection_established",
                 "message": "Real-time connection established",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": datetime.now(timezone.utc)
             },
             websocket
         )
@@ -46,7 +75,9 @@ class ConnectionManager:
         """Remove a WebSocket connection."""
         if admin_username in self.active_connections:
             self.active_connections[admin_username].discard(websocket)
-            self.connection_count -= 1
+            # Only count connections that were still registered (a failed broadcast may have removed it already)
+            if self._all_connections.pop(websocket, None) is not None:
+                self.connection_count -= 1
             
             # Clean up empty sets
             if not self.active_connections[admin_username]:
@@ -57,7 +88,7 @@ class ConnectionManager:
     async def send_personal_message(self, message: dict, websocket: WebSocket):
         """Send a message to a specific WebSocket connection."""
         try:
-            await websocket.send_json(message)
+            await websocket.send_text(encode_message(message))
         except Exception as e:
             logger.error(f"Error sending personal message: {e}")
     
@@ -69,57 +100,61 @@ class ConnectionManager:
             message: The message dictionary to broadcast
             exclude_admin: Optional admin username to exclude from broadcast
         """
-        disconnected = []
+        if self._all_connections:
+            await self.broadcast_text(encode_message(message), exclude_admin)
+    
+    async def broadcast_text(self, text: str, exclude_admin: str = None):
+        """Broadcast an already serialized message to all connected admin clients."""
+        # Skip connections of the excluded admin
+        targets = [
+            (connection, admin_username)
+            for connection, admin_username in self._all_connections.items()
+            if not (exclude_admin and admin_username == exclude_admin)
+        ]
         
-        for admin_username, connections in self.active_connections.items():
-            # Skip if this admin should be excluded
-            if exclude_admin and admin_username == exclude_admin:
-                continue
-            
-            for connection in connections.copy():
-                try:
-                    await connection.send_json(message)
-                except Exception as e:
-                    logger.error(f"Error broadcasting to {admin_username}: {e}")
-                    disconnected.append((connection, admin_username))
+        if not targets:
+            return
+        
+        # Send to all connections concurrently so one slow client doesn't delay the rest
+        results = await asyncio.gather(
+            *(connection.send_text(text) for connection, _ in targets),
+            return_exceptions=True
+        )
         
         # Clean up disconnected clients
-        for connection, admin_username in disconnected:
-            self.disconnect(connection, admin_username)
+        for (connection, admin_username), result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error broadcasting to {admin_username}: {result}")
+                self.disconnect(connection, admin_username)
     
     async def broadcast_new_donation(self, donation_data: dict):
         """Broadcast a new donation submission event."""
-        message = {
-            "type": "new_donation",
-            "data": donation_data,
-            "timestamp": datetime.now().isoformat()
-        }
-        await self.broadcast(message)
+        if self._all_connections:
+            await self.broadcast_text(
+                encode_event(_NEW_DONATION_PREFIX, donation_data, datetime.now(timezone.utc))
+            )
         logger.info(f"Broadcasted new donation: {donation_data.get('id')}")
     
     async def broadcast_donation_verified(self, donation_id: int, verified: bool, verified_by: str):
         """Broadcast a donation verification status change."""
-        message = {
-            "type": "donation_verified" if verified else "donation_unverified",
-            "data": {
+        if self._all_connections:
+            now = datetime.now(timezone.utc)
+            data = {
                 "id": donation_id,
                 "is_verified": verified,
                 "verified_by": verified_by,
-                "verified_at": datetime.now().isoformat()
-            },
-            "timestamp": datetime.now().isoformat()
-        }
-        await self.broadcast(message)
+                "verified_at": now.replace(tzinfo=None),  # Naive UTC, like the stored verified_at
+            }
+            prefix = _DONATION_VERIFIED_PREFIX if verified else _DONATION_UNVERIFIED_PREFIX
+            await self.broadcast_text(encode_event(prefix, data, now))
         logger.info(f"Broadcasted verification change for donation {donation_id}: {verified}")
     
     async def broadcast_stats_update(self, stats: dict):
         """Broadcast updated dashboard statistics."""
-        message = {
-            "type": "stats_update",
-            "data": stats,
-            "timestamp": datetime.now().isoformat()
-        }
-        await self.broadcast(message)
+        if self._all_connections:
+            await self.broadcast_text(
+                encode_event(_STATS_UPDATE_PREFIX, stats, datetime.now(timezone.utc))
+            )
         logger.info("Broadcasted stats update")
     
     def get_connection_count(self) -> int: